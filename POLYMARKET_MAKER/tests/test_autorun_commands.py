@@ -0,0 +1,251 @@
+import time
+
+import poly_maker_autorun as module
+
+
+def _build_manager(tmp_path):
+    base = {
+        "log_dir": tmp_path / "logs",
+        "data_dir": tmp_path / "data",
+        "handled_topics_path": tmp_path / "handled.json",
+        "filter_output_path": tmp_path / "topics.json",
+        "filter_params_path": tmp_path / "filter_params.json",
+        "runtime_status_path": tmp_path / "status.json",
+    }
+    global_conf = module.GlobalConfig(
+        **base,
+        topics_poll_sec=1.0,
+        command_poll_sec=5.0,
+    )
+    return module.AutoRunManager(global_conf, {}, module.FilterConfig(), {})
+
+
+def test_wait_for_commands_wakes_on_request_stop(tmp_path):
+    mgr = _build_manager(tmp_path)
+    mgr.request_stop()
+
+    started = time.monotonic()
+    mgr._wait_for_commands(mgr.config.command_poll_sec)
+
+    assert time.monotonic() - started < 1.0
+    assert mgr.stop_event.is_set()
+
+
+def test_wait_for_commands_handles_queued_exit(tmp_path):
+    mgr = _build_manager(tmp_path)
+    mgr.enqueue_command("list")
+    mgr.enqueue_command("exit")
+
+    mgr._wait_for_commands(mgr.config.command_poll_sec)
+
+    assert mgr.stop_event.is_set()
+    assert not mgr._cmd_deque
+
+
+def test_refresh_runs_in_background_and_merges_on_collect(tmp_path, monkeypatch):
+    mgr = _build_manager(tmp_path)
+    mgr.handled_topics = {"old"}
+    monkeypatch.setattr(
+        module,
+        "run_filter_once",
+        lambda *args, **kwargs: [{"slug": "old"}, {"slug": "new", "title": "New"}],
+    )
+
+    mgr._refresh_topics()
+    mgr._refresh_future.result(timeout=5)
+    assert list(mgr.pending_topics) == []
+
+    mgr._collect_refresh_result()
+
+    assert list(mgr.pending_topics) == ["new"]
+    assert mgr.topics.titles[mgr.topics.index["new"]] == "New"
+    assert mgr._refresh_future is None
+
+
+def test_refresh_command_during_running_filter_is_rerun(tmp_path, monkeypatch, capsys):
+    import threading
+
+    mgr = _build_manager(tmp_path)
+    release = threading.Event()
+    calls = []
+
+    def _fake_filter(*args, **kwargs):
+        calls.append(1)
+        release.wait(timeout=5)
+        return []
+
+    monkeypatch.setattr(module, "run_filter_once", _fake_filter)
+
+    mgr._refresh_topics(force=True)
+    mgr._cmd_refresh()
+    assert "完成后将立即重新筛选" in capsys.readouterr().out
+
+    release.set()
+    mgr._refresh_future.result(timeout=5)
+    mgr._collect_refresh_result()
+    mgr._refresh_future.result(timeout=5)
+    assert calls == [1, 1]
+    assert mgr._refresh_requested is False
+
+
+def test_periodic_refresh_reuses_recent_filter_output(tmp_path, monkeypatch):
+    mgr = _build_manager(tmp_path)
+    mgr.config.topics_poll_sec = 300.0
+    module._dump_json_file(
+        mgr.config.filter_output_path,
+        {"params": mgr.filter_config.to_dict(), "topics": [{"slug": "x"}]},
+    )
+    calls = []
+    monkeypatch.setattr(
+        module, "run_filter_once", lambda *args, **kwargs: calls.append(1) or []
+    )
+
+    mgr._refresh_topics()
+    assert list(mgr.pending_topics) == ["x"]
+    assert mgr._refresh_future is None
+
+    # 同一文件再次刷新时不再复用，而是重新执行筛选
+    mgr._refresh_topics()
+    mgr._refresh_future.result(timeout=5)
+    assert calls == [1]
+
+
+def test_recent_filter_output_with_other_params_is_not_reused(tmp_path):
+    mgr = _build_manager(tmp_path)
+    mgr.config.topics_poll_sec = 300.0
+    other_params = module.FilterConfig(max_end_days=30).to_dict()
+    module._dump_json_file(
+        mgr.config.filter_output_path,
+        {"params": other_params, "topics": [{"slug": "x"}]},
+    )
+
+    assert mgr._load_recent_filter_output() is None
+
+
+def test_filter_output_written_in_order_by_writer_thread(tmp_path):
+    mgr = _build_manager(tmp_path)
+    path = mgr.config.filter_output_path
+
+    mgr._write_filter_output(path, {"topics": [{"slug": "first"}]})
+    mgr._write_filter_output(path, {"topics": [{"slug": "second"}]})
+    mgr._write_future.result(timeout=5)
+
+    assert module._load_json_file(path)["topics"] == [{"slug": "second"}]
+    # 自身写入的结果不会被当作外部更新复用
+    assert mgr._filter_output_mtime == path.stat().st_mtime_ns
+    assert mgr._load_recent_filter_output() is None
+
+
+def test_periodic_status_is_suppressed_when_unchanged(tmp_path, capsys):
+    mgr = _build_manager(tmp_path)
+
+    mgr._print_status(only_if_changed=True)
+    mgr._print_status(only_if_changed=True)
+    assert capsys.readouterr().out.count("当前无运行中的话题") == 1
+
+    mgr._print_status()
+    assert "当前无运行中的话题" in capsys.readouterr().out
+
+
+def test_command_loop_returns_promptly_on_request_stop(tmp_path, monkeypatch):
+    import os
+    import threading
+
+    mgr = _build_manager(tmp_path)
+    stdin_r, stdin_w = os.pipe()
+    stdin = os.fdopen(stdin_r, "r")
+    monkeypatch.setattr(module.sys, "stdin", stdin)
+    loop = threading.Thread(target=mgr.command_loop)
+    loop.start()
+    try:
+        for _ in range(100):
+            if mgr._wakeup_fd is not None:
+                break
+            time.sleep(0.01)
+        started = time.monotonic()
+        mgr.request_stop()
+        loop.join(timeout=2.0)
+        assert not loop.is_alive()
+        assert time.monotonic() - started < 1.0
+    finally:
+        os.close(stdin_w)
+        loop.join(timeout=1.0)
+        stdin.close()
+
+
+def test_command_loop_exits_on_eof_from_file_stdin(tmp_path, monkeypatch):
+    import threading
+
+    mgr = _build_manager(tmp_path)
+    mgr.config.command_poll_sec = 0.05
+    stdin_path = tmp_path / "stdin.txt"
+    stdin_path.write_text("", encoding="utf-8")
+    stdin = stdin_path.open("r", encoding="utf-8")
+    monkeypatch.setattr(module.sys, "stdin", stdin)
+
+    def _drain_commands():
+        while not mgr.stop_event.is_set():
+            mgr._wait_for_commands(0.05)
+
+    drainer = threading.Thread(target=_drain_commands, daemon=True)
+    drainer.start()
+    try:
+        mgr.command_loop()
+        # EOF 被当作 exit 命令处理，由主循环侧置位停止标记
+        stopped_by_eof = mgr.stop_event.is_set()
+    finally:
+        mgr.request_stop()
+        drainer.join(timeout=2.0)
+        stdin.close()
+
+    assert stopped_by_eof
+    assert mgr._wakeup_fd is None
+
+
+def test_fmt_ts_matches_strftime_and_handles_missing():
+    ts = 1_700_000_000.75
+    expected = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(int(ts)))
+
+    assert module._fmt_ts(ts) == expected
+    assert module._fmt_ts(None) == "-"
+
+
+def test_supervise_returns_on_request_stop_and_worker_exit(tmp_path):
+    import threading
+    import time
+
+    mgr = _build_manager(tmp_path)
+    mgr.config.command_poll_sec = 30.0
+    blocker = threading.Event()
+    worker = threading.Thread(target=blocker.wait, daemon=True)
+    worker.start()
+
+    threading.Timer(0.1, mgr.request_stop).start()
+    started = time.monotonic()
+    mgr.supervise(worker)
+    assert time.monotonic() - started < 5
+    assert mgr._wakeup_sock is None
+
+    blocker.set()
+    worker.join()
+    mgr.stop_event.clear()
+    mgr.supervise(worker)
+
+
+def test_signal_handler_defers_stop_to_waiting_loop(tmp_path, capsys):
+    import threading
+
+    mgr = _build_manager(tmp_path)
+    mgr.config.command_poll_sec = 30.0
+    blocker = threading.Event()
+    worker = threading.Thread(target=blocker.wait, daemon=True)
+    worker.start()
+
+    mgr.handle_signal(15)
+    assert not mgr.stop_event.is_set()
+
+    mgr.supervise(worker)
+
+    assert mgr.stop_event.is_set()
+    assert "signal 15 received" in capsys.readouterr().out
+    blocker.set()
@@ -0,0 +1,68 @@
+import datetime as dt
+import json
+import types
+
+import poly_maker_autorun as module
+
+
+def _fake_result():
+    fs = module._load_filter_script()
+    hot = fs.MarketSnapshot(
+        slug="hot",
+        title="Hot market",
+        yes=fs.OutcomeSnapshot(name="YES", token_id="y-hot"),
+        no=fs.OutcomeSnapshot(name="NO", token_id="n-hot"),
+        liquidity=100.0,
+        totalVolume=50000.0,
+        end_time=dt.datetime(2026, 1, 2, tzinfo=dt.timezone.utc),
+    )
+    cold = fs.MarketSnapshot(slug="cold", title="Cold market")
+    return types.SimpleNamespace(
+        total_markets=10,
+        candidates=[hot, cold],
+        chosen=[hot, cold],
+        rejected=[],
+        highlights=[
+            types.SimpleNamespace(market=hot, outcome=hot.no, hours_to_end=5.0)
+        ],
+    )
+
+
+def test_run_filter_once_keeps_only_highlighted_topics(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        module._load_filter_script(),
+        "collect_filter_results",
+        lambda **kwargs: _fake_result(),
+    )
+    output = tmp_path / "topics.json"
+
+    topics = module.run_filter_once(module.FilterConfig(), output)
+
+    assert topics == [
+        {
+            "slug": "hot",
+            "title": "Hot market",
+            "yes_token": "y-hot",
+            "no_token": "n-hot",
+            "end_time": "2026-01-02T00:00:00+00:00",
+            "liquidity": 100.0,
+            "total_volume": 50000.0,
+            "preferred_side": "NO",
+            "highlight_sides": ["NO"],
+        }
+    ]
+    written = json.loads(output.read_text(encoding="utf-8"))
+    assert written["topics"] == topics
+    assert written["chosen"] == 2
+    assert dt.datetime.strptime(written["generated_at"], "%Y-%m-%dT%H:%M:%SZ")
+    assert written["highlights"] == 1
+    assert written["params"]["highlight"]["ask_min"] == module.HighlightConfig.ask_min
+
+
+def test_filter_defaults_match_filter_script():
+    fs = module._load_filter_script()
+    conf = module.FilterConfig()
+
+    assert conf.min_end_hours == fs.DEFAULT_MIN_END_HOURS
+    assert conf.legacy_end_days == fs.DEFAULT_LEGACY_END_DAYS
+    assert conf.blacklist_terms == list(fs.DEFAULT_BLACKLIST_TERMS)
@@ -0,0 +1,65 @@
+import poly_maker_autorun as module
+
+
+def _build_manager(tmp_path):
+    base = {
+        "log_dir": tmp_path / "logs",
+        "data_dir": tmp_path / "data",
+        "handled_topics_path": tmp_path / "handled.json",
+        "filter_output_path": tmp_path / "topics.json",
+        "filter_params_path": tmp_path / "filter_params.json",
+        "runtime_status_path": tmp_path / "status.json",
+    }
+    global_conf = module.GlobalConfig(
+        **base,
+        topics_poll_sec=1.0,
+        command_poll_sec=0.1,
+    )
+    return module.AutoRunManager(global_conf, {}, module.FilterConfig(), {})
+
+
+def test_handled_topics_written_immediately_on_start_or_stop(tmp_path):
+    mgr = _build_manager(tmp_path)
+    path = mgr.config.handled_topics_path
+
+    mgr._update_handled_topics(["a"])
+
+    assert module.read_handled_topics(path) == {"a"}
+    assert mgr._handled_dirty is False
+
+
+def test_bulk_restore_write_is_deferred_until_flush(tmp_path):
+    mgr = _build_manager(tmp_path)
+    path = mgr.config.handled_topics_path
+
+    mgr._update_handled_topics(["a", "b"], flush=False)
+    mgr._maybe_flush_handled()
+    assert not path.exists()
+
+    mgr._maybe_flush_handled(force=True)
+    assert module.read_handled_topics(path) == {"a", "b"}
+    assert [p.name for p in tmp_path.iterdir()] == ["handled.json"]
+
+
+def test_handled_topics_unchanged_update_keeps_clean(tmp_path):
+    mgr = _build_manager(tmp_path)
+    mgr._update_handled_topics(["a"])
+    mgr._maybe_flush_handled(force=True)
+
+    mgr._update_handled_topics(["a"])
+
+    assert mgr._handled_dirty is False
+
+
+def test_compute_new_topics_skips_handled_and_empty_ids():
+    latest = [
+        {"slug": "a"},
+        {"slug": "", "topic_id": "b"},
+        {"title": "no id"},
+        "c",
+    ]
+
+    assert module.compute_new_topics(latest, {"c"}) == ["a", "b"]
+    assert module.compute_new_topic_ids(["a", "", "b"], {"b"}) == ["a"]
+    assert module.compute_new_topic_ids(["b", "a", "b", "c"], {"c"}) == ["b", "a"]
+    assert module.compute_new_topic_ids(["a"], {"a"}) == []
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+import poly_maker_autorun as module
+
+
+def test_load_json_file_reuses_parse_until_file_changes(tmp_path):
+    path = tmp_path / "conf.json"
+    path.write_text(json.dumps({"a": 1}), encoding="utf-8")
+
+    first = module._load_json_file(path)
+    assert module._load_json_file(path) is first
+
+    path.write_text(json.dumps({"a": 22}), encoding="utf-8")
+    assert module._load_json_file(path) == {"a": 22}
+
+
+def test_dump_json_file_invalidates_cache(tmp_path):
+    path = tmp_path / "conf.json"
+    module._dump_json_file(path, {"a": 1})
+    assert module._load_json_file(path) == {"a": 1}
+
+    module._dump_json_file(path, {"a": 2})
+    assert module._load_json_file(path) == {"a": 2}
+
+
+def test_data_file_reads_bypass_parse_cache(tmp_path):
+    path = tmp_path / "handled.json"
+    module.write_handled_topics(path, ["a", "b"])
+
+    assert module.read_handled_topics(path) == {"a", "b"}
+    assert path.resolve() not in module._JSON_CACHE
+
+
+def test_load_json_file_missing_returns_empty(tmp_path):
+    assert module._load_json_file(tmp_path / "missing.json") == {}
+
+
+def test_load_configs_rejects_bad_filter_config_before_other_files(
+    tmp_path, monkeypatch
+):
+    paths = {
+        name: tmp_path / f"{name}.json"
+        for name in ("global", "strategy", "filter", "run")
+    }
+    paths["filter"].write_text(json.dumps({"max_end_days": "soon"}), encoding="utf-8")
+    args = module.parse_args(
+        [
+            "--global-config", str(paths["global"]),
+            "--strategy-config", str(paths["strategy"]),
+            "--filter-config", str(paths["filter"]),
+            "--run-config-template", str(paths["run"]),
+        ]
+    )
+    loaded = []
+    real_load = module._load_json_file
+    monkeypatch.setattr(
+        module, "_load_json_file", lambda path: loaded.append(path) or real_load(path)
+    )
+
+    with pytest.raises(ValueError):
+        module.load_configs(args)
+    assert loaded == [paths["filter"]]
+
+
+def test_json_dumps_keeps_non_ascii_and_round_trips():
+    payload = {"title": "美国大选", "items": [1, 2.5, None]}
+
+    blob = module._json_dumps(payload, indent=False)
+
+    assert "美国大选".encode("utf-8") in blob
+    assert module._json_loads(blob) == payload
+
+
+def test_dump_json_file_replaces_atomically(tmp_path):
+    path = tmp_path / "nested" / "out.json"
+
+    module._dump_json_file(path, {"v": 1})
+    module._dump_json_file(path, {"v": 2}, fsync=True)
+
+    assert module._load_json_file(path) == {"v": 2}
+    assert [p.name for p in path.parent.iterdir()] == ["out.json"]
+
+
+def test_atomic_write_uses_private_tmp_per_writer(tmp_path):
+    import threading
+
+    path = tmp_path / "shared.json"
+    errors = []
+
+    def _writer(tag):
+        try:
+            for i in range(200):
+                module._dump_json_file(path, {"tag": tag, "i": i})
+        except Exception as exc:  # pragma: no cover - 失败时由断言报告
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_writer, args=(t,)) for t in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert module._load_json_file(path)["i"] == 199
+    assert [p.name for p in tmp_path.iterdir()] == ["shared.json"]
+
+
+def test_atomic_write_failure_keeps_old_file_and_removes_tmp(tmp_path):
+    path = tmp_path / "out.json"
+    module._dump_json_file(path, {"v": 1})
+
+    def _chunks():
+        yield b"{"
+        raise RuntimeError("encode failed")
+
+    with pytest.raises(RuntimeError):
+        module._atomic_write_chunks(path, _chunks())
+
+    assert module._load_json_file(path) == {"v": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_global_config_fsync_defaults_off():
+    assert module.GlobalConfig.from_dict({}).fsync is False
+    assert module.GlobalConfig.from_dict({"fsync": True}).fsync is True
+
+
+def test_dump_filter_result_streams_one_topic_per_line(tmp_path):
+    path = tmp_path / "topics.json"
+    payload = {
+        "generated_at": "2026-01-01T00:00:00Z",
+        "chosen": 2,
+        "topics": [{"slug": "a", "title": "美国"}, {"slug": "b"}],
+    }
+
+    module._dump_filter_result(path, payload)
+
+    assert module._load_json_file(path) == payload
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[1:3] == ['{"slug":"a","title":"美国"},', '{"slug":"b"}']
+
+    module._dump_filter_result(path, {"topics": []})
+    assert module._load_json_file(path) == {"topics": []}
@@ -0,0 +1,173 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import poly_maker_autorun as module
+
+
+def _build_manager(tmp_path):
+    base = {
+        "log_dir": tmp_path / "logs",
+        "data_dir": tmp_path / "data",
+        "handled_topics_path": tmp_path / "handled.json",
+        "filter_output_path": tmp_path / "topics.json",
+        "filter_params_path": tmp_path / "filter_params.json",
+        "runtime_status_path": tmp_path / "status.json",
+    }
+    global_conf = module.GlobalConfig(
+        **base,
+        topics_poll_sec=1.0,
+        command_poll_sec=0.1,
+    )
+    return module.AutoRunManager(global_conf, {}, module.FilterConfig(), {})
+
+
+@pytest.mark.skipif(not hasattr(os, "waitid"), reason="需要 POSIX waitid")
+def test_sigchld_reap_releases_running_slot(tmp_path):
+    mgr = _build_manager(tmp_path)
+    proc = subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"])
+    # 等待子进程退出但不回收，留给 _reap_children 处理
+    os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+
+    task = module.TopicTask(topic_id="t1", process=proc, no_restart=True)
+    mgr.tasks["t1"] = task
+    mgr._pid_to_task[proc.pid] = task
+    mgr._running_count = 1
+    mgr._child_watch_enabled = True
+    mgr._child_exited.set()
+    mgr._poll_tasks()
+
+    assert proc.returncode == 3
+    assert not mgr._child_exited.is_set()
+    assert proc.pid not in mgr._pid_to_task
+    assert mgr._running_count == 0
+    assert "t1" not in mgr.tasks
+
+
+def test_idle_tick_with_child_watcher_does_not_poll(tmp_path, monkeypatch):
+    mgr = _build_manager(tmp_path)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        for _ in range(3)
+    ]
+    try:
+        for i, proc in enumerate(procs):
+            task = module.TopicTask(topic_id=f"t{i}", process=proc, status="running")
+            mgr.tasks[task.topic_id] = task
+            mgr._pid_to_task[proc.pid] = task
+        mgr._running_count = len(procs)
+        mgr._child_watch_enabled = True
+
+        polls = []
+        real_poll = subprocess.Popen.poll
+        monkeypatch.setattr(
+            subprocess.Popen,
+            "poll",
+            lambda self: polls.append(self.pid) or real_poll(self),
+        )
+        mgr._poll_tasks()
+        mgr._purge_inactive_tasks()
+        mgr._ordered_running_tasks()
+
+        assert polls == []
+        assert len(mgr.tasks) == 3
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+
+def test_reconcile_running_count_detects_reap_outside_release(tmp_path, capsys):
+    mgr = _build_manager(tmp_path)
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()  # 绕过 _release_process 直接回收
+
+    task = module.TopicTask(topic_id="t1", process=proc, no_restart=True)
+    mgr.tasks["t1"] = task
+    mgr._pid_to_task[proc.pid] = task
+    mgr._running_count = 1
+
+    mgr._reconcile_running_count(time.time())
+
+    assert mgr._running_count == 0
+    assert "运行计数漂移" in capsys.readouterr().out
+    # 已清理登记，之后的正常释放不会把计数扣成负数
+    mgr._release_process(task)
+    assert mgr._running_count == 0
+
+
+def test_start_topic_process_appends_to_log(tmp_path, monkeypatch):
+    script = tmp_path / "fake_run.py"
+    script.write_text(
+        "import sys, time\nprint('hello', sys.argv[1], flush=True)\ntime.sleep(30)\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(module, "_VOL_ARB_SCRIPT", str(script))
+    mgr = _build_manager(tmp_path)
+    mgr.config.process_stagger_max_sec = 0.0
+    mgr.config.log_dir.mkdir(parents=True)
+    _, log_path = mgr._get_topic_paths("a/b")
+    log_path.write_text("previous\n", encoding="utf-8")
+
+    assert mgr._start_topic_process("a/b") is True
+    task = mgr.tasks["a/b"]
+    try:
+        assert mgr._running_count == 1
+        assert log_path.name == "autorun_a_b.log"
+        for _ in range(100):
+            if "hello" in log_path.read_text(encoding="utf-8"):
+                break
+            time.sleep(0.05)
+        content = log_path.read_text(encoding="utf-8")
+        assert content.startswith("previous\n")
+        assert "hello" in content
+    finally:
+        mgr._terminate_task(task, reason="test")
+
+    assert mgr._running_count == 0
+
+
+def test_build_run_config_reads_topic_columns(tmp_path):
+    mgr = _build_manager(tmp_path)
+    mgr.topics = module.TopicSoA.from_entries(
+        [
+            {
+                "slug": "will-x",
+                "title": "Will X?",
+                "yes_token": "y1",
+                "no_token": "n1",
+                "end_time": "2026-01-01T00:00:00+00:00",
+                "highlight_sides": ["NO"],
+            },
+            "bare-topic",
+        ]
+    )
+
+    merged = mgr._build_run_config("will-x")
+    assert merged["market_url"] == "https://polymarket.com/market/will-x"
+    assert merged["topic_name"] == "Will X?"
+    assert (merged["yes_token"], merged["no_token"]) == ("y1", "n1")
+    assert merged["side"] == "NO"
+
+    bare = mgr._build_run_config("bare-topic")
+    assert bare["market_url"] == "https://polymarket.com/market/bare-topic"
+    assert "side" not in bare
+
+
+def test_write_run_config_skips_identical_payload(tmp_path):
+    mgr = _build_manager(tmp_path)
+    cfg_path, _ = mgr._get_topic_paths("t1")
+
+    mgr._write_run_config("t1", cfg_path, {"topic_id": "t1", "order_size": 5})
+    os.utime(cfg_path, ns=(0, 0))
+
+    mgr._write_run_config("t1", cfg_path, {"order_size": 5, "topic_id": "t1"})
+    assert cfg_path.stat().st_mtime_ns == 0
+
+    mgr._write_run_config("t1", cfg_path, {"topic_id": "t1", "order_size": 6})
+    assert cfg_path.stat().st_mtime_ns != 0
+    assert module._load_json_file(cfg_path)["order_size"] == 6
+    assert [p.name for p in cfg_path.parent.iterdir()] == [cfg_path.name]
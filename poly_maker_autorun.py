@@ -9,28 +9,48 @@ from __future__ import annotations
 
 import argparse
 import concurrent.futures
+import functools
+import hashlib
+import heapq
 import json
+import logging
 import math
+import os
 import random
-import queue
 import select
+import selectors
 import signal
+import socket
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 import traceback
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
-import Customize_fliter_blacklist as filter_script
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - 回退到标准库 json
+    orjson = None
+
+# 筛选脚本依赖 requests 等较重的模块，首次使用时再导入（见 _load_filter_script）
+_filter_script = None
+
+# 高频、低信息量的输出走 logger.debug，默认级别下不做格式化；--verbose 打开
+logger = logging.getLogger("autorun")
 
 # =====================
 # 配置与常量
 # =====================
 PROJECT_ROOT = Path(__file__).resolve().parent
 MAKER_ROOT = PROJECT_ROOT / "POLYMARKET_MAKER"
+_VOL_ARB_SCRIPT = str(MAKER_ROOT / "Volatility_arbitrage_run.py")
+# 子进程日志直接以 fd 追加打开；Windows 无 O_CLOEXEC，Popen 会自行复制句柄
+_LOG_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_CLOEXEC", 0)
 
 DEFAULT_GLOBAL_CONFIG = {
     "topics_poll_sec": 300.0,
@@ -51,19 +71,44 @@ DEFAULT_GLOBAL_CONFIG = {
     "topic_start_cooldown_sec": 5.0,
     "log_excerpt_interval_sec": 15.0,
     "runtime_status_path": str(MAKER_ROOT / "data" / "autorun_status.json"),
+    "fsync": False,
 }
 
 FILTER_CONFIG_RELOAD_INTERVAL_SEC = 3600
+# 与 Customize_fliter_blacklist 中的同名默认值保持一致，避免为读取默认值而导入筛选脚本
+DEFAULT_FILTER_MIN_END_HOURS = 1.0
+DEFAULT_FILTER_LEGACY_END_DAYS = 730
+DEFAULT_FILTER_BLACKLIST_TERMS: tuple[str, ...] = ()
+HANDLED_TOPICS_FLUSH_INTERVAL_SEC = 30.0
+RUNNING_COUNT_RECONCILE_INTERVAL_SEC = 300.0
+TERMINAL_TASK_STATUSES = frozenset({"stopped", "exited", "error", "ended"})
 ORDER_SIZE_DECIMALS = 4  # Polymarket 下单数量精度（按买单精度取整）
 
 
+def _load_filter_script() -> Any:
+    """按需导入筛选脚本并缓存模块对象。"""
+
+    global _filter_script
+    if _filter_script is None:
+        import Customize_fliter_blacklist
+
+        _filter_script = Customize_fliter_blacklist
+    return _filter_script
+
+
 def _topic_id_from_entry(entry: Any) -> str:
     """从筛选结果条目中提取 topic_id/slug，兼容字符串或 dict。"""
 
     if isinstance(entry, str):
         return entry
     if isinstance(entry, dict):
-        return str(entry.get("slug") or entry.get("topic_id") or "").strip()
+        slug = entry.get("slug")
+        if slug:
+            return str(slug).strip()
+        topic_id = entry.get("topic_id")
+        if topic_id:
+            return str(topic_id).strip()
+        return ""
     return str(entry).strip()
 
 
@@ -71,6 +116,19 @@ def _safe_topic_filename(topic_id: str) -> str:
     return topic_id.replace("/", "_").replace("\\", "_")
 
 
+@functools.lru_cache(maxsize=1024)
+def _fmt_local_second(second: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+
+
+def _fmt_ts(ts: Optional[float]) -> str:
+    """本地时间格式化，按整秒缓存；同一秒内的多个任务共用结果。"""
+
+    if not ts:
+        return "-"
+    return _fmt_local_second(int(ts))
+
+
 def _coerce_float(value: Any) -> Optional[float]:
     try:
         if value is None:
@@ -119,27 +177,124 @@ def _scale_order_size_by_volume(
     return _ceil_to_precision(weighted_size, decimals)
 
 
-def _load_json_file(path: Path) -> Dict[str, Any]:
-    """读取 JSON 配置，不存在则返回空 dict。"""
-    if not path.exists():
+def _json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: Any, *, indent: bool = True, sort_keys: bool = False) -> bytes:
+    """序列化为 UTF-8 字节（不转义非 ASCII）；安装 orjson 时使用其 C 实现。"""
+
+    if orjson is not None:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(data, option=option)
+    text = json.dumps(
+        data,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+    )
+    return text.encode("utf-8")
+
+
+# path -> (st_mtime_ns, st_size, parsed)，文件未变化时跳过重复解析；仅用于配置文件
+_JSON_CACHE: Dict[Path, tuple[int, int, Any]] = {}
+
+
+def _load_json_file(path: Path, *, cache: bool = True) -> Dict[str, Any]:
+    """读取 JSON 配置，不存在则返回空 dict。
+
+    文件 mtime/size 未变化时直接返回上次解析结果（共享对象，调用方不应原地修改）。
+    只读一次或持续增长的数据文件应传 cache=False，避免解析结果常驻内存。
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         return {}
-    with path.open("r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError as exc:  # pragma: no cover - 粗略校验
-            raise RuntimeError(f"无法解析 JSON 配置: {path}: {exc}") from exc
+    key = path.resolve() if cache else None
+    cached = _JSON_CACHE.get(key) if cache else None
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    raw = path.read_bytes()
+    try:
+        data = _json_loads(raw)
+    except ValueError as exc:  # pragma: no cover - 粗略校验
+        raise RuntimeError(f"无法解析 JSON 配置: {path}: {exc}") from exc
+    if cache:
+        _JSON_CACHE[key] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
 
+def _invalidate_json_cache(path: Path) -> None:
+    # 自身写入后立即失效，避免 mtime 粒度较粗的文件系统上读到旧缓存
+    _JSON_CACHE.pop(path.resolve(), None)
+
+
+def _atomic_write_chunks(
+    path: Path, chunks: Iterable[bytes], *, fsync: bool = False
+) -> None:
+    """写入同目录临时文件后 os.replace，读者不会看到半截文件；fsync 仅在需要持久化时开启。"""
 
-def _dump_json_file(path: Path, data: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 每次写入使用唯一的临时文件名，多个实例同时写同一路径时互不截断
+    fd, tmp_name = tempfile.mkstemp(
+        dir=str(path.parent), prefix=path.name + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            for chunk in chunks:
+                fp.write(chunk)
+            if fsync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        # mkstemp 默认 0o600，恢复为普通输出文件的权限
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:  # pragma: no cover - 已被替换或删除
+            pass
+        raise
+    _invalidate_json_cache(path)
+
+
+def _atomic_write_bytes(path: Path, blob: bytes, *, fsync: bool = False) -> None:
+    _atomic_write_chunks(path, (blob,), fsync=fsync)
+
+
+def _dump_json_file(path: Path, data: Dict[str, Any], *, fsync: bool = False) -> None:
+    _atomic_write_bytes(path, _json_dumps(data), fsync=fsync)
+
+
+def _iter_filter_result_chunks(payload: Dict[str, Any]) -> Iterable[bytes]:
+    header = _json_dumps(
+        {k: v for k, v in payload.items() if k != "topics"}, indent=False
+    )
+    yield header[:-1] + (b',"topics":[' if len(header) > 2 else b'"topics":[')
+    for i, topic in enumerate(payload.get("topics") or ()):
+        yield (b"\n" if i == 0 else b",\n") + _json_dumps(topic, indent=False)
+    yield b"\n]}\n"
+
+
+def _dump_filter_result(
+    path: Path, payload: Dict[str, Any], *, fsync: bool = False
+) -> None:
+    """筛选结果逐条编码写入（每行一个话题），不在内存中拼出整份 JSON 文本。"""
+
+    _atomic_write_chunks(path, _iter_filter_result_chunks(payload), fsync=fsync)
 
 
 def read_handled_topics(path: Path) -> set[str]:
     """读取历史已处理话题集合，空文件或字段缺失则返回空集合。"""
 
-    data = _load_json_file(path)
+    data = _load_json_file(path, cache=False)
     topics = data.get("topics") or data.get("handled_topics")
     if topics is None:
         return set()
@@ -149,26 +304,38 @@ def read_handled_topics(path: Path) -> set[str]:
     return {str(t) for t in topics}
 
 
-def write_handled_topics(path: Path, topics: set[str]) -> None:
-    """写入最新的已处理话题集合。"""
+def write_handled_topics(
+    path: Path, topics: Iterable[str], *, fsync: bool = False
+) -> None:
+    """写入最新的已处理话题集合（紧凑格式，先写临时文件再原子替换）。"""
 
+    topic_list = list(topics)
     payload = {
         "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "total": len(topics),
-        "topics": sorted(topics),
+        "total": len(topic_list),
+        "topics": topic_list,
     }
-    _dump_json_file(path, payload)
+    _atomic_write_bytes(path, _json_dumps(payload, indent=False), fsync=fsync)
 
 
 def compute_new_topics(latest: List[Any], handled: set[str]) -> List[str]:
     """从最新筛选结果中筛出尚未处理的话题列表。"""
 
-    result: List[str] = []
-    for entry in latest:
-        topic_id = _topic_id_from_entry(entry)
-        if topic_id and topic_id not in handled:
-            result.append(topic_id)
-    return result
+    return compute_new_topic_ids(
+        (_topic_id_from_entry(entry) for entry in latest), handled
+    )
+
+
+def compute_new_topic_ids(ids: Iterable[str], handled: set[str]) -> List[str]:
+    """与 compute_new_topics 相同，但输入为已提取好的 topic_id 序列；结果保序去重。"""
+
+    ids = ids if isinstance(ids, list) else list(ids)
+    # set 差集在 C 层完成；常见的"无新增"场景到此直接返回
+    new_ids = set(ids).difference(handled)
+    new_ids.discard("")
+    if not new_ids:
+        return []
+    return [topic_id for topic_id in dict.fromkeys(ids) if topic_id in new_ids]
 
 
 @dataclass
@@ -201,6 +368,7 @@ class GlobalConfig:
     runtime_status_path: Path = field(
         default_factory=lambda: Path(DEFAULT_GLOBAL_CONFIG["runtime_status_path"])
     )
+    fsync: bool = DEFAULT_GLOBAL_CONFIG["fsync"]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "GlobalConfig":
@@ -287,6 +455,7 @@ class GlobalConfig:
                 merged.get("log_excerpt_interval_sec", cls.log_excerpt_interval_sec)
             ),
             runtime_status_path=runtime_status_path,
+            fsync=bool(merged.get("fsync", cls.fsync)),
         )
 
     @staticmethod
@@ -323,6 +492,7 @@ class HighlightConfig:
         )
 
     def apply_to_filter(self) -> None:
+        filter_script = _load_filter_script()
         if self.max_hours is not None:
             filter_script.HIGHLIGHT_MAX_HOURS = float(self.max_hours)
         if self.ask_min is not None:
@@ -346,11 +516,11 @@ class HighlightConfig:
 
 @dataclass
 class FilterConfig:
-    min_end_hours: float = filter_script.DEFAULT_MIN_END_HOURS
+    min_end_hours: float = DEFAULT_FILTER_MIN_END_HOURS
     max_end_days: int = 5
     gamma_window_days: int = 2
     gamma_min_window_hours: int = 1
-    legacy_end_days: int = filter_script.DEFAULT_LEGACY_END_DAYS
+    legacy_end_days: int = DEFAULT_FILTER_LEGACY_END_DAYS
     allow_illiquid: bool = False
     skip_orderbook: bool = False
     no_rest_backfill: bool = False
@@ -358,7 +528,7 @@ class FilterConfig:
     books_timeout_sec: float = 5.0
     only: str = ""
     blacklist_terms: List[str] = field(
-        default_factory=lambda: list(filter_script.DEFAULT_BLACKLIST_TERMS)
+        default_factory=lambda: list(DEFAULT_FILTER_BLACKLIST_TERMS)
     )
     highlight: HighlightConfig = field(default_factory=HighlightConfig)
 
@@ -382,7 +552,7 @@ class FilterConfig:
             only=str(data.get("only", cls.only)),
             blacklist_terms=[
                 str(t).strip()
-                for t in data.get("blacklist_terms", filter_script.DEFAULT_BLACKLIST_TERMS)
+                for t in data.get("blacklist_terms", DEFAULT_FILTER_BLACKLIST_TERMS)
                 if str(t).strip()
             ],
             highlight=highlight_conf,
@@ -414,7 +584,7 @@ class FilterConfig:
         self.highlight.apply_to_filter()
 
     def apply_blacklist(self) -> None:
-        filter_script.set_blacklist_terms(self.blacklist_terms)
+        _load_filter_script().set_blacklist_terms(self.blacklist_terms)
 
 
 @dataclass
@@ -441,6 +611,43 @@ class TopicTask:
         return bool(self.process) and (self.process.poll() is None)
 
 
+@dataclass
+class TopicSoA:
+    """筛选结果的列式视图：每轮刷新构建一次，按 index 取各字段。"""
+
+    ids: List[str] = field(default_factory=list)
+    slugs: List[Optional[str]] = field(default_factory=list)
+    titles: List[Optional[str]] = field(default_factory=list)
+    yes_tokens: List[Optional[str]] = field(default_factory=list)
+    no_tokens: List[Optional[str]] = field(default_factory=list)
+    end_times: List[Optional[str]] = field(default_factory=list)
+    total_volumes: List[Any] = field(default_factory=list)
+    preferred_sides: List[Optional[str]] = field(default_factory=list)
+    highlight_sides: List[List[str]] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Any]) -> "TopicSoA":
+        soa = cls()
+        for entry in entries:
+            topic_id = _topic_id_from_entry(entry)
+            if not topic_id:
+                continue
+            info = entry if isinstance(entry, dict) else {}
+            # 重复 topic_id 以最后一条为准，与 dict 映射语义一致
+            soa.index[topic_id] = len(soa.ids)
+            soa.ids.append(topic_id)
+            soa.slugs.append(info.get("slug"))
+            soa.titles.append(info.get("title"))
+            soa.yes_tokens.append(info.get("yes_token"))
+            soa.no_tokens.append(info.get("no_token"))
+            soa.end_times.append(info.get("end_time"))
+            soa.total_volumes.append(info.get("total_volume"))
+            soa.preferred_sides.append(info.get("preferred_side"))
+            soa.highlight_sides.append(info.get("highlight_sides") or [])
+        return soa
+
+
 class AutoRunManager:
     def __init__(
         self,
@@ -454,18 +661,59 @@ class AutoRunManager:
         self.filter_config = filter_config
         self.run_params_template = run_params_template or {}
         self.stop_event = threading.Event()
-        self.command_queue: "queue.Queue[str]" = queue.Queue()
+        # 单生产者/单消费者命令通道：deque 的 append/popleft 本身线程安全，
+        # _cmd_event 负责唤醒主循环（新命令、停止请求、筛选完成）
+        self._cmd_deque: deque[str] = deque()
+        self._cmd_event = threading.Event()
+        # command_loop 运行期间的自唤醒管道写端
+        self._wakeup_fd: Optional[int] = None
+        # supervise 运行期间的唤醒 socket 写端（Windows 的 select 仅支持 socket）
+        self._wakeup_sock: Optional[socket.socket] = None
+        # 信号处理器只记录信号编号并写唤醒管道，停止流程由主线程的等待循环接手
+        self._pending_signal: Optional[int] = None
         self.tasks: Dict[str, TopicTask] = {}
         self.latest_topics: List[Dict[str, Any]] = []
-        self.topic_details: Dict[str, Dict[str, Any]] = {}
+        self.topics = TopicSoA()
         self.handled_topics: set[str] = set()
-        self.pending_topics: List[str] = []
+        self._handled_dirty = False
+        self._last_handled_flush: float = time.time()
+        self.pending_topics: deque[str] = deque()
+        # 与 pending_topics 同步维护，用于 O(1) 去重判断
+        self._pending_set: set[str] = set()
         self._next_topics_refresh: float = 0.0
         self._next_status_dump: float = 0.0
+        self._last_status_signature: Optional[tuple] = None
         self._next_filter_reload: float = 0.0
         self._filter_conf_mtime: Optional[float] = None
         self._next_topic_start_at: float = 0.0
         self.status_path = self.config.runtime_status_path
+        # SIGCHLD 驱动的子进程回收；未安装时退回逐个 poll
+        self._child_watch_enabled = False
+        self._child_exited = threading.Event()
+        # 仍在运行的子进程 pid -> 任务；与 _running_count 同步维护
+        self._pid_to_task: Dict[int, TopicTask] = {}
+        self._running_count = 0
+        self._next_running_reconcile: float = 0.0
+        # 每个话题的 (cfg_path, log_path) 与合并后的运行参数缓存
+        self._topic_paths: Dict[str, tuple[Path, Path]] = {}
+        self._topic_run_config: Dict[str, Dict[str, Any]] = {}
+        self._log_dirs_created: set[Path] = set()
+        # topic_id -> 最近一次写盘的运行参数摘要，内容未变时跳过重写
+        self._cfg_hashes: Dict[str, bytes] = {}
+        # 筛选涉及网络请求，放到单独线程执行，避免阻塞命令处理与子进程回收
+        self._refresh_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="filter"
+        )
+        self._refresh_future: Optional[concurrent.futures.Future] = None
+        # 筛选进行中收到的 refresh 命令，待本轮完成后补跑
+        self._refresh_requested = False
+        # 筛选结果写盘交给单独线程，下一轮写入前先等待上一轮完成以保证顺序
+        self._writer_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="filter-writer"
+        )
+        self._write_future: Optional[concurrent.futures.Future] = None
+        # 最近一次由本实例写入或复用的筛选输出 mtime（ns）
+        self._filter_output_mtime: int = 0
 
     # ========== 核心循环 ==========
     def run_loop(self) -> None:
@@ -478,35 +726,76 @@ class AutoRunManager:
                 try:
                     now = time.time()
                     self._process_commands()
+                    self._collect_refresh_result()
                     self._poll_tasks()
+                    self._reconcile_running_count(now)
                     self._schedule_pending_topics()
                     self._maybe_reload_filter_config(now)
                     self._purge_inactive_tasks()
+                    self._maybe_flush_handled()
                     if now >= self._next_topics_refresh:
                         self._refresh_topics()
                         self._next_topics_refresh = now + self.config.topics_poll_sec
                     if now >= self._next_status_dump:
-                        self._print_status()
+                        self._print_status(only_if_changed=True)
                         self._dump_runtime_status()
                         self._next_status_dump = now + max(
                             5.0, self.config.command_poll_sec
                         )
-                    time.sleep(self.config.command_poll_sec)
+                    self._wait_for_commands(self.config.command_poll_sec)
                 except Exception as exc:  # pragma: no cover - 防御性保护
                     print(f"[ERROR] 主循环异常已捕获，将继续运行: {exc}")
                     traceback.print_exc()
-                    time.sleep(max(1.0, self.config.command_poll_sec))
+                    self.stop_event.wait(max(1.0, self.config.command_poll_sec))
         finally:
+            self._refresh_pool.shutdown(wait=False, cancel_futures=True)
+            # 已提交的筛选结果需完整落盘
+            self._writer_pool.shutdown(wait=True)
             self._cleanup_all_tasks()
             self._dump_runtime_status()
             print("[DONE] autorun stopped")
 
+    def install_child_watcher(self) -> bool:
+        """注册 SIGCHLD 处理器（仅主线程、仅 POSIX），成功后按信号回收子进程。"""
+
+        sigchld = getattr(signal, "SIGCHLD", None)
+        if sigchld is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(sigchld, self._on_sigchld)
+        self._child_watch_enabled = True
+        # 首轮主动回收一次，覆盖注册前已退出的子进程
+        self._child_exited.set()
+        return True
+
+    def _on_sigchld(self, signum: int, frame: Any) -> None:  # pragma: no cover - 信号处理不可测
+        self._child_exited.set()
+
+    def _reap_children(self) -> None:
+        if not self._child_exited.is_set():
+            return
+        # 先清除再回收，避免回收期间到达的 SIGCHLD 丢失
+        self._child_exited.clear()
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            task = self._pid_to_task.get(pid)
+            if task and task.process and task.process.pid == pid:
+                # 回填 returncode，后续 poll()/wait() 直接返回而不再调用 waitpid
+                task.process.returncode = os.waitstatus_to_exitcode(status)
+
     def _poll_tasks(self) -> None:
-        for task in list(self.tasks.values()):
+        if self._child_watch_enabled:
+            self._reap_children()
+        # 任务表只在主循环线程内修改，且循环内只会覆盖已有键（重启），无需快照
+        for task in self.tasks.values():
             proc = task.process
-            if not proc:
+            if not proc or task.status in TERMINAL_TASK_STATUSES:
                 continue
-            rc = proc.poll()
+            rc = proc.returncode if self._child_watch_enabled else proc.poll()
             if rc is None:
                 task.status = "running"
                 task.last_heartbeat = time.time()
@@ -534,9 +823,49 @@ class AutoRunManager:
 
         self._purge_inactive_tasks()
 
+    def _task_alive(self, task: TopicTask) -> bool:
+        """判断子进程是否存活；启用 SIGCHLD 回收时只读 returncode，不再逐个 waitpid。"""
+
+        proc = task.process
+        if proc is None:
+            return False
+        if self._child_watch_enabled:
+            return proc.returncode is None
+        return proc.poll() is None
+
+    def _release_process(self, task: TopicTask) -> None:
+        """子进程确认退出后释放并发名额，重复调用无副作用。"""
+
+        proc = task.process
+        if proc and self._pid_to_task.pop(proc.pid, None) is not None:
+            self._running_count -= 1
+
+    def _reconcile_running_count(self, now: float) -> None:
+        if now < self._next_running_reconcile:
+            return
+        self._next_running_reconcile = now + RUNNING_COUNT_RECONCILE_INTERVAL_SEC
+        # 以子进程实际存活情况为准，能发现绕过 _release_process 的回收（如 proc.poll()）
+        expected = sum(1 for task in self.tasks.values() if task.is_running())
+        if self._running_count != expected:
+            print(
+                f"[WARN] 运行计数漂移：counter={self._running_count} running={expected}，已校正"
+            )
+            self._running_count = expected
+            # 同步清理已退出的登记，避免之后 _release_process 再次扣减
+            stale = [
+                pid
+                for pid, task in self._pid_to_task.items()
+                if task.process is None
+                or task.process.pid != pid
+                or not task.is_running()
+            ]
+            for pid in stale:
+                del self._pid_to_task[pid]
+
     def _handle_process_exit(self, task: TopicTask, rc: int) -> None:
+        self._release_process(task)
         task.process = None
-        if task.status not in {"stopped", "exited", "error", "ended"}:
+        if task.status not in TERMINAL_TASK_STATUSES:
             task.status = "exited" if rc == 0 else "error"
         task.heartbeat(f"process finished rc={rc}")
         self._update_log_excerpt(task)
@@ -562,8 +891,8 @@ class AutoRunManager:
                 time.sleep(self.config.process_retry_delay_sec)
                 if self._start_topic_process(task.topic_id):
                     return
-                if task.restart_attempts < max_retries and task.topic_id not in self.pending_topics:
-                    self.pending_topics.append(task.topic_id)
+                if task.restart_attempts < max_retries:
+                    self._enqueue_pending(task.topic_id)
             task.status = "error"
 
     def _update_log_excerpt(self, task: TopicTask, max_bytes: int = 2000) -> None:
@@ -610,7 +939,7 @@ class AutoRunManager:
         return any(p.lower() in excerpt for p in patterns)
 
     def _schedule_pending_topics(self) -> None:
-        running = sum(1 for t in self.tasks.values() if t.is_running())
+        running = self._running_count
         while (
             self.pending_topics
             and running < max(1, int(self.config.max_concurrent_tasks))
@@ -618,8 +947,9 @@ class AutoRunManager:
             now = time.time()
             if now < self._next_topic_start_at:
                 break
-            topic_id = self.pending_topics.pop(0)
-            if topic_id in self.tasks and self.tasks[topic_id].is_running():
+            topic_id = self.pending_topics.popleft()
+            self._pending_set.discard(topic_id)
+            if topic_id in self.tasks and self._task_alive(self.tasks[topic_id]):
                 continue
             try:
                 started = self._start_topic_process(topic_id)
@@ -627,14 +957,32 @@ class AutoRunManager:
                 print(f"[ERROR] 调度话题 {topic_id} 时异常: {exc}")
                 traceback.print_exc()
                 started = False
-            if not started and topic_id not in self.pending_topics:
+            if not started:
                 # 启动失败时重新入队，避免话题被遗忘
-                self.pending_topics.append(topic_id)
+                self._enqueue_pending(topic_id)
             elif started:
                 self._next_topic_start_at = now + max(
                     0.0, float(self.config.topic_start_cooldown_sec)
                 )
-            running = sum(1 for t in self.tasks.values() if t.is_running())
+            running = self._running_count
+
+    def _enqueue_pending(self, topic_id: str) -> bool:
+        """话题追加到待启动队列尾部，已在队列中则忽略并返回 False。"""
+
+        if topic_id in self._pending_set:
+            return False
+        self.pending_topics.append(topic_id)
+        self._pending_set.add(topic_id)
+        return True
+
+    def _discard_pending(self, topic_id: str) -> None:
+        if topic_id not in self._pending_set:
+            return
+        self._pending_set.discard(topic_id)
+        try:
+            self.pending_topics.remove(topic_id)
+        except ValueError:
+            pass
 
     def _get_order_base_volume(self) -> Optional[float]:
         highlight_conf = getattr(self.filter_config, "highlight", None)
@@ -660,22 +1008,34 @@ class AutoRunManager:
 
         merged = {**base_template, **base, **topic_overrides}
 
-        topic_info = self.topic_details.get(topic_id, {})
-        slug = topic_info.get("slug") or topic_id
-        merged["market_url"] = f"https://polymarket.com/market/{slug}"
+        topics = self.topics
+        idx = topics.index.get(topic_id)
+        if idx is None:
+            slug = title = yes_token = no_token = end_time = None
+            total_volume_raw = preferred_side = None
+            highlight_sides: List[str] = []
+        else:
+            slug = topics.slugs[idx]
+            title = topics.titles[idx]
+            yes_token = topics.yes_tokens[idx]
+            no_token = topics.no_tokens[idx]
+            end_time = topics.end_times[idx]
+            total_volume_raw = topics.total_volumes[idx]
+            preferred_side = topics.preferred_sides[idx] or None
+            highlight_sides = topics.highlight_sides[idx]
+
+        merged["market_url"] = f"https://polymarket.com/market/{slug or topic_id}"
         merged["topic_id"] = topic_id
 
-        if topic_info.get("title"):
-            merged["topic_name"] = topic_info.get("title")
-        if topic_info.get("yes_token"):
-            merged["yes_token"] = topic_info.get("yes_token")
-        if topic_info.get("no_token"):
-            merged["no_token"] = topic_info.get("no_token")
-        if topic_info.get("end_time"):
-            merged["end_time"] = topic_info.get("end_time")
-
-        highlight_sides = topic_info.get("highlight_sides") or []
-        preferred_side = topic_info.get("preferred_side") or None
+        if title:
+            merged["topic_name"] = title
+        if yes_token:
+            merged["yes_token"] = yes_token
+        if no_token:
+            merged["no_token"] = no_token
+        if end_time:
+            merged["end_time"] = end_time
+
         if preferred_side is None and highlight_sides:
             preferred_side = highlight_sides[0]
         if preferred_side:
@@ -684,7 +1044,7 @@ class AutoRunManager:
             merged["highlight_sides"] = highlight_sides
 
         base_order_size = _coerce_float(merged.get("order_size"))
-        total_volume = _coerce_float(topic_info.get("total_volume"))
+        total_volume = _coerce_float(total_volume_raw)
         volume_growth_factor = _coerce_float(merged.get("volume_growth_factor"))
         if base_order_size is not None and total_volume is not None:
             scaled_size = _scale_order_size_by_volume(
@@ -698,54 +1058,88 @@ class AutoRunManager:
             merged["order_size"] = scaled_size
         return merged
 
-    def _start_topic_process(self, topic_id: str) -> bool:
-        config_data = self._build_run_config(topic_id)
-        cfg_path = self.config.data_dir / f"run_params_{_safe_topic_filename(topic_id)}.json"
-        _dump_json_file(cfg_path, config_data)
+    def _get_topic_paths(self, topic_id: str) -> tuple[Path, Path]:
+        paths = self._topic_paths.get(topic_id)
+        if paths is None:
+            safe = _safe_topic_filename(topic_id)
+            paths = (
+                self.config.data_dir / f"run_params_{safe}.json",
+                self.config.log_dir / f"autorun_{safe}.log",
+            )
+            self._topic_paths[topic_id] = paths
+        return paths
+
+    def _get_run_config(self, topic_id: str) -> Dict[str, Any]:
+        """返回缓存的运行参数；筛选结果或筛选配置更新时整体失效。"""
+
+        config_data = self._topic_run_config.get(topic_id)
+        if config_data is None:
+            config_data = self._build_run_config(topic_id)
+            self._topic_run_config[topic_id] = config_data
+        return config_data
+
+    def _write_run_config(
+        self, topic_id: str, cfg_path: Path, config_data: Dict[str, Any]
+    ) -> None:
+        blob = _json_dumps(config_data, sort_keys=True)
+        digest = hashlib.blake2b(blob, digest_size=16).digest()
+        if self._cfg_hashes.get(topic_id) == digest and cfg_path.exists():
+            return
+        _atomic_write_bytes(cfg_path, blob, fsync=self.config.fsync)
+        self._cfg_hashes[topic_id] = digest
 
-        log_path = self.config.log_dir / f"autorun_{_safe_topic_filename(topic_id)}.log"
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+    def _start_topic_process(self, topic_id: str) -> bool:
+        config_data = self._get_run_config(topic_id)
+        cfg_path, log_path = self._get_topic_paths(topic_id)
+        self._write_run_config(topic_id, cfg_path, config_data)
+
+        log_dir = log_path.parent
+        if log_dir not in self._log_dirs_created:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            self._log_dirs_created.add(log_dir)
         try:
-            log_file = log_path.open("a", encoding="utf-8")
+            log_fd = os.open(str(log_path), _LOG_OPEN_FLAGS, 0o644)
         except OSError as exc:  # pragma: no cover - 文件系统异常
             print(f"[ERROR] 无法创建日志文件 {log_path}: {exc}")
             return False
 
-        max_stagger = max(0.0, float(self.config.process_stagger_max_sec))
-        if max_stagger > 0:
-            delay = random.uniform(0, max_stagger)
-            if delay > 0:
-                print(
-                    f"[SCHEDULE] topic={topic_id} 启动前随机延迟 {delay:.2f}s 以错峰运行"
-                )
-                time.sleep(delay)
-
-        cmd = [
-            sys.executable,
-            str(MAKER_ROOT / "Volatility_arbitrage_run.py"),
-            str(cfg_path),
-        ]
-        proc: Optional[subprocess.Popen] = None
-        attempts = max(1, int(self.config.process_start_retries))
-        for attempt in range(1, attempts + 1):
-            try:
-                proc = subprocess.Popen(
-                    cmd,
-                    stdin=subprocess.DEVNULL,
-                    stdout=log_file,
-                    stderr=subprocess.STDOUT,
-                    start_new_session=True,
-                )
-                log_file.close()
-                break
-            except Exception as exc:  # pragma: no cover - 子进程异常
-                print(
-                    f"[ERROR] 启动 topic={topic_id} 失败（尝试 {attempt}/{attempts}）: {exc}"
-                )
-                if attempt >= attempts:
-                    log_file.close()
-                    return False
-                time.sleep(self.config.process_retry_delay_sec)
+        try:
+            max_stagger = max(0.0, float(self.config.process_stagger_max_sec))
+            if max_stagger > 0:
+                delay = random.uniform(0, max_stagger)
+                if delay > 0:
+                    logger.debug(
+                        "[SCHEDULE] topic=%s 启动前随机延迟 %.2fs 以错峰运行", topic_id, delay
+                    )
+                    time.sleep(delay)
+
+            cmd = [
+                sys.executable,
+                _VOL_ARB_SCRIPT,
+                str(cfg_path),
+            ]
+            proc: Optional[subprocess.Popen] = None
+            attempts = max(1, int(self.config.process_start_retries))
+            for attempt in range(1, attempts + 1):
+                try:
+                    proc = subprocess.Popen(
+                        cmd,
+                        stdin=subprocess.DEVNULL,
+                        stdout=log_fd,
+                        stderr=subprocess.STDOUT,
+                        start_new_session=True,
+                    )
+                    break
+                except Exception as exc:  # pragma: no cover - 子进程异常
+                    print(
+                        f"[ERROR] 启动 topic={topic_id} 失败（尝试 {attempt}/{attempts}）: {exc}"
+                    )
+                    if attempt >= attempts:
+                        return False
+                    time.sleep(self.config.process_retry_delay_sec)
+        finally:
+            # 子进程已持有自己的副本，父进程侧立即关闭
+            os.close(log_fd)
 
         if not proc or proc.poll() is not None:
             rc_text = proc.poll() if proc else "?"
@@ -756,6 +1150,8 @@ class AutoRunManager:
 
         task = self.tasks.get(topic_id) or TopicTask(topic_id=topic_id)
         task.process = proc
+        self._pid_to_task[proc.pid] = task
+        self._running_count += 1
         task.config_path = cfg_path
         task.log_path = log_path
         task.status = "running"
@@ -769,28 +1165,97 @@ class AutoRunManager:
     def _load_handled_topics(self) -> None:
         self.handled_topics = read_handled_topics(self.config.handled_topics_path)
         if self.handled_topics:
-            preview = ", ".join(sorted(self.handled_topics)[:5])
+            preview = ", ".join(heapq.nsmallest(5, self.handled_topics))
             print(
                 f"[INIT] 已加载历史话题 {len(self.handled_topics)} 个 preview={preview}"
             )
         else:
             print("[INIT] 尚无历史处理话题记录")
 
-    def _update_handled_topics(self, new_topics: List[str]) -> None:
-        if not new_topics:
-            return
+    def _update_handled_topics(
+        self, new_topics: Iterable[str], *, flush: bool = True
+    ) -> None:
+        """更新已处理集合；话题启动/停止时立即落盘，避免崩溃后下次运行重复启动。
+
+        flush=False 仅用于批量恢复等路径，写入由 _maybe_flush_handled 合并执行。
+        """
+
+        before = len(self.handled_topics)
         self.handled_topics.update(new_topics)
-        write_handled_topics(self.config.handled_topics_path, self.handled_topics)
+        if len(self.handled_topics) != before:
+            self._handled_dirty = True
+            if flush:
+                self._maybe_flush_handled(force=True)
+
+    def _maybe_flush_handled(self, force: bool = False) -> None:
+        if not self._handled_dirty:
+            return
+        now = time.time()
+        if not force and now - self._last_handled_flush < HANDLED_TOPICS_FLUSH_INTERVAL_SEC:
+            return
+        write_handled_topics(
+            self.config.handled_topics_path, self.handled_topics, fsync=self.config.fsync
+        )
+        self._handled_dirty = False
+        self._last_handled_flush = now
 
     # ========== 命令处理 ==========
     def enqueue_command(self, command: str) -> None:
-        self.command_queue.put(command)
+        self._cmd_deque.append(command)
+        self._cmd_event.set()
+
+    def request_stop(self) -> None:
+        """置位停止标记并唤醒主循环，退出无需等满一个轮询周期。"""
+
+        self.stop_event.set()
+        self._cmd_event.set()
+        self._wake_waiters()
+
+    def handle_signal(self, signum: int) -> None:
+        """信号处理器入口：不触碰 Event（其内部锁不可重入，主线程可能正持有）。"""
+
+        self._pending_signal = signum
+        self._wake_waiters()
+
+    def _consume_signal(self) -> bool:
+        """在主线程等待循环中调用：若收到过信号，则在此完成停止请求。"""
+
+        signum = self._pending_signal
+        if signum is None:
+            return False
+        self._pending_signal = None
+        print(f"\n[WARN] signal {signum} received, exiting...")
+        self.request_stop()
+        return True
+
+    def _wake_waiters(self) -> None:
+        # 仅做 write/send 系统调用，可在信号处理器中安全执行
+        wake_fd = self._wakeup_fd
+        if wake_fd is not None:
+            try:
+                os.write(wake_fd, b"\0")
+            except OSError:  # pragma: no cover - 管道已关闭
+                pass
+        wake_sock = self._wakeup_sock
+        if wake_sock is not None:
+            try:
+                wake_sock.send(b"\0")
+            except OSError:  # pragma: no cover - 缓冲区已满或已关闭
+                pass
+
+    def _wait_for_commands(self, timeout: float) -> None:
+        """阻塞等待命令或停止请求，超时后返回进入下一轮调度。"""
+
+        if self._cmd_event.wait(max(0.0, timeout)):
+            self._process_commands()
 
     def _process_commands(self) -> None:
+        # 先清除再取，避免取空之后到达的命令丢失唤醒
+        self._cmd_event.clear()
         while True:
             try:
-                cmd = self.command_queue.get_nowait()
-            except queue.Empty:
+                cmd = self._cmd_deque.popleft()
+            except IndexError:
                 break
             print(f"[CMD] processing: {cmd}")
             self._handle_command(cmd.strip())
@@ -799,52 +1264,67 @@ class AutoRunManager:
         if not cmd:
             print("[CMD] 忽略空命令（可能未正确捕获输入或输入仅为空白）")
             return
-        if cmd in {"quit", "exit"}:
-            print("[CHOICE] exit requested")
-            self.stop_event.set()
-            return
-        if cmd == "list":
-            self._print_status()
+        handler = _CMD_TABLE.get(cmd)
+        if handler is not None:
+            handler(self)
             return
         if cmd.startswith("stop "):
             _, topic_id = cmd.split(" ", 1)
             self._stop_topic(topic_id.strip())
             return
-        if cmd == "refresh":
-            self._refresh_topics()
-            return
         print(f"[WARN] 未识别命令: {cmd}")
 
-    def _print_status(self) -> None:
-        if not self.tasks:
-            print("[RUN] 当前无运行中的话题")
+    def _cmd_exit(self) -> None:
+        print("[CHOICE] exit requested")
+        self.request_stop()
+
+    def _cmd_refresh(self) -> None:
+        self._refresh_topics(force=True)
+
+    def _print_status(self, only_if_changed: bool = False) -> None:
+        """一次性写出全部运行中话题；only_if_changed 时状态无变化则不输出。"""
+
+        running_tasks = self._ordered_running_tasks() if self.tasks else []
+        # 心跳时间每轮都会变化，不计入签名
+        signature = tuple(
+            (
+                task.topic_id,
+                task.status,
+                task.process.pid if task.process else None,
+                task.log_excerpt,
+            )
+            for task in running_tasks
+        )
+        if only_if_changed and signature == self._last_status_signature:
             return
-        running_tasks = self._ordered_running_tasks()
+        self._last_status_signature = signature
+
         if not running_tasks:
             print("[RUN] 当前无运行中的话题")
             return
+        buf = "".join(
+            self._format_task_line(task, idx) + "\n"
+            for idx, task in enumerate(running_tasks, 1)
+        )
+        sys.stdout.write(buf)
+        sys.stdout.flush()
 
-        for idx, task in enumerate(running_tasks, 1):
-            self._print_single_task(task, idx)
-
-    def _print_single_task(self, task: TopicTask, index: Optional[int] = None) -> None:
-        hb = task.last_heartbeat
-        hb_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(hb)) if hb else "-"
+    def _format_task_line(self, task: TopicTask, index: Optional[int] = None) -> str:
         pid_text = str(task.process.pid) if task.process else "-"
         log_name = task.log_path.name if task.log_path else "-"
         log_hint = (task.log_excerpt.splitlines() or ["-"])[-1].strip()
 
         prefix = f"[RUN {index}]" if index is not None else "[RUN]"
-        print(
+        return (
             f"{prefix} topic={task.topic_id} status={task.status} "
-            f"start={time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(task.start_time))} "
-            f"pid={pid_text} hb={hb_text} notes={len(task.notes)} "
+            f"start={_fmt_ts(task.start_time)} "
+            f"pid={pid_text} hb={_fmt_ts(task.last_heartbeat)} notes={len(task.notes)} "
             f"log={log_name} last_line={log_hint or '-'}"
         )
 
     def _ordered_running_tasks(self) -> List[TopicTask]:
         return sorted(
-            [task for task in self.tasks.values() if task.is_running()],
+            [task for task in self.tasks.values() if self._task_alive(task)],
             key=lambda t: (t.start_time, t.topic_id),
         )
 
@@ -859,14 +1339,8 @@ class AutoRunManager:
         task.no_restart = True
         task.end_reason = "stopped by user"
         # 标记为已处理，避免后续 refresh 把同一话题再次入队
-        if topic_id not in self.handled_topics:
-            self.handled_topics.add(topic_id)
-            write_handled_topics(self.config.handled_topics_path, self.handled_topics)
-        if topic_id in self.pending_topics:
-            try:
-                self.pending_topics.remove(topic_id)
-            except ValueError:
-                pass
+        self._update_handled_topics([topic_id])
+        self._discard_pending(topic_id)
         self._terminate_task(task, reason="stopped by user")
         self._purge_inactive_tasks()
         print(f"[CHOICE] stop topic={topic_id}")
@@ -902,6 +1376,8 @@ class AutoRunManager:
                     proc.wait(timeout=1.0)
                 except Exception as exc:  # pragma: no cover - kill 失败
                     print(f"[WARN] 无法强杀 topic {task.topic_id}: {exc}")
+        if proc and proc.poll() is not None:
+            self._release_process(task)
         if task.status not in {"error", "ended"}:
             task.status = "stopped"
         task.heartbeat(reason)
@@ -910,62 +1386,155 @@ class AutoRunManager:
         """移除已停止/结束且不再需要展示的任务。"""
 
         removable: List[str] = []
-        for topic_id, task in list(self.tasks.items()):
-            if task.is_running():
+        for topic_id, task in self.tasks.items():
+            if self._task_alive(task):
                 continue
-            if task.status in {"stopped", "ended", "exited", "error"} or task.no_restart:
+            if task.status in TERMINAL_TASK_STATUSES or task.no_restart:
                 removable.append(topic_id)
 
         if not removable:
             return
 
         for topic_id in removable:
-            self.tasks.pop(topic_id, None)
-            if topic_id in self.pending_topics:
-                try:
-                    self.pending_topics.remove(topic_id)
-                except ValueError:
-                    pass
-
-    def _refresh_topics(self) -> None:
-        try:
-            self.latest_topics = run_filter_once(
-                self.filter_config,
-                self.config.filter_output_path,
-                timeout_sec=self.config.filter_timeout_sec,
-                max_retries=self.config.filter_max_retries,
-                retry_delay_sec=self.config.filter_retry_delay_sec,
-            )
-            self.topic_details = {
-                _topic_id_from_entry(item): item
-                for item in self.latest_topics
-                if _topic_id_from_entry(item)
-            }
-            new_topics = compute_new_topics(self.latest_topics, self.handled_topics)
-            if new_topics:
-                preview = ", ".join(new_topics[:5])
+            task = self.tasks.pop(topic_id, None)
+            if task:
+                self._release_process(task)
+            self._discard_pending(topic_id)
+
+    def _refresh_topics(self, force: bool = False) -> None:
+        """在后台线程提交一次筛选，结果由 _collect_refresh_result 在主循环中合并。
+
+        非强制刷新时，若筛选输出文件在一个轮询周期内被其他实例更新过，则直接复用该文件。
+        """
+
+        if self._refresh_future is not None and not self._refresh_future.done():
+            if force:
+                # 用户主动 refresh 不丢弃：当前筛选结束后立即再跑一轮
+                self._refresh_requested = True
+                print("[FILTER] 上一轮筛选仍在进行，完成后将立即重新筛选")
+            else:
+                logger.debug("[FILTER] 上一轮筛选仍在进行，忽略本次刷新请求")
+            return
+        if not force:
+            topics = self._load_recent_filter_output()
+            if topics is not None:
                 print(
-                    f"[INCR] 新话题 {len(new_topics)} 个，将更新历史记录 preview={preview}"
+                    f"[FILTER] 复用近期筛选结果 {self.config.filter_output_path}，共 {len(topics)} 个话题"
                 )
-                for topic_id in new_topics:
-                    if topic_id in self.pending_topics:
-                        continue
-                    if topic_id in self.tasks and self.tasks[topic_id].is_running():
-                        continue
-                    self.pending_topics.append(topic_id)
-            else:
-                print("[INCR] 无新增话题")
+                self._apply_refresh_result(topics)
+                return
+        future = self._refresh_pool.submit(
+            run_filter_once,
+            self.filter_config,
+            self.config.filter_output_path,
+            timeout_sec=self.config.filter_timeout_sec,
+            max_retries=self.config.filter_max_retries,
+            retry_delay_sec=self.config.filter_retry_delay_sec,
+            write_output=self._write_filter_output,
+        )
+        # 完成后唤醒主循环，无需等满 command_poll_sec 即可合并结果
+        future.add_done_callback(lambda _: self._cmd_event.set())
+        self._refresh_future = future
+
+    def _collect_refresh_result(self) -> None:
+        future = self._refresh_future
+        if future is None or not future.done():
+            return
+        self._refresh_future = None
+        try:
+            topics = future.result()
         except Exception as exc:  # pragma: no cover - 网络/外部依赖
             print(f"[ERROR] 筛选流程失败：{exc}")
             self.latest_topics = []
+        else:
+            self._apply_refresh_result(topics)
+        if self._refresh_requested:
+            self._refresh_requested = False
+            self._refresh_topics(force=True)
+
+    def _write_filter_output(self, path: Path, payload: Dict[str, Any]) -> None:
+        """由筛选线程调用：等待上一轮写盘结束后，把本轮结果交给写盘线程。"""
+
+        previous = self._write_future
+        if previous is not None:
+            try:
+                previous.result()
+            except Exception:  # pragma: no cover - 已在写盘线程中报告
+                pass
+        self._write_future = self._writer_pool.submit(
+            self._dump_filter_output, path, payload
+        )
+
+    def _dump_filter_output(self, path: Path, payload: Dict[str, Any]) -> None:
+        try:
+            _dump_filter_result(path, payload, fsync=self.config.fsync)
+        except Exception as exc:  # pragma: no cover - 磁盘异常
+            print(f"[ERROR] 筛选结果写盘失败：{exc}")
+            raise
+        # 记录自身写入后的 mtime，避免下一轮把自己的结果当作外部更新复用
+        self._filter_output_mtime = self._filter_output_mtime_ns()
+
+    def _apply_refresh_result(self, topics: List[Dict[str, Any]]) -> None:
+        self.latest_topics = topics
+        # 单次遍历构建列式视图，供运行参数生成与增量比对共用
+        self.topics = TopicSoA.from_entries(self.latest_topics)
+        self._topic_run_config.clear()
+        new_topics = compute_new_topic_ids(self.topics.ids, self.handled_topics)
+        if new_topics:
+            preview = ", ".join(new_topics[:5])
+            print(
+                f"[INCR] 新话题 {len(new_topics)} 个，将更新历史记录 preview={preview}"
+            )
+            for topic_id in new_topics:
+                if topic_id in self.tasks and self._task_alive(self.tasks[topic_id]):
+                    continue
+                self._enqueue_pending(topic_id)
+        else:
+            print("[INCR] 无新增话题")
+
+    def _filter_output_mtime_ns(self) -> int:
+        try:
+            return self.config.filter_output_path.stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def _load_recent_filter_output(self) -> Optional[List[Dict[str, Any]]]:
+        """筛选输出被外部更新且未超过 topics_poll_sec 时返回其中的话题，否则返回 None。"""
+
+        path = self.config.filter_output_path
+        if self._write_future is not None and not self._write_future.done():
+            return None
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        # mtime 未变化说明仍是本实例上次的结果，需要重新筛选
+        if stat.st_mtime_ns == self._filter_output_mtime:
+            return None
+        if time.time() - stat.st_mtime >= self.config.topics_poll_sec:
+            return None
+        try:
+            data = _load_json_file(path, cache=False)
+        except Exception as exc:  # pragma: no cover - 文件损坏
+            print(f"[WARN] 读取筛选结果失败，将重新筛选：{exc}")
+            return None
+        # 默认输出路径由所有实例共用，只复用按相同筛选参数生成的结果
+        if data.get("params") != self.filter_config.to_dict():
+            logger.debug("[FILTER] 近期筛选结果的参数与本实例不同，不复用")
+            return None
+        topics = data.get("topics")
+        if not isinstance(topics, list):
+            return None
+        self._filter_output_mtime = stat.st_mtime_ns
+        return topics
 
     def _cleanup_all_tasks(self) -> None:
-        for task in list(self.tasks.values()):
+        for task in self.tasks.values():
             if task.is_running():
                 print(f"[CLEAN] 停止 topic={task.topic_id} ...")
                 self._terminate_task(task, reason="cleanup")
         # 写回 handled_topics，确保最新状态落盘
-        write_handled_topics(self.config.handled_topics_path, self.handled_topics)
+        self._maybe_flush_handled(force=True)
 
     def _maybe_reload_filter_config(self, now: Optional[float] = None) -> None:
         if now is None:
@@ -989,6 +1558,8 @@ class AutoRunManager:
         try:
             filter_conf_raw = _load_json_file(self.config.filter_params_path)
             self.filter_config = FilterConfig.from_dict(filter_conf_raw)
+            # 下单份数缩放依赖 highlight.min_total_volume，需重新生成运行参数
+            self._topic_run_config.clear()
             self._filter_conf_mtime = current_mtime
             print(
                 f"[CONFIG] 已重新加载筛选配置（每 {FILTER_CONFIG_RELOAD_INTERVAL_SEC // 60:.0f} 分钟轮询一次）。"
@@ -1002,7 +1573,7 @@ class AutoRunManager:
         if not self.status_path.exists():
             return
         try:
-            payload = _load_json_file(self.status_path)
+            payload = _load_json_file(self.status_path, cache=False)
             handled_topics = payload.get("handled_topics") or []
             pending_topics = payload.get("pending_topics") or []
             tasks_snapshot = payload.get("tasks") or {}
@@ -1011,23 +1582,24 @@ class AutoRunManager:
             return
 
         if handled_topics:
-            self.handled_topics.update(str(t) for t in handled_topics)
+            self._update_handled_topics(
+                (str(t) for t in handled_topics), flush=False
+            )
 
         restored_topics: List[str] = []
         for topic_id in pending_topics:
             topic_id = str(topic_id)
-            if topic_id in self.pending_topics or topic_id in self.handled_topics:
+            if topic_id in self.handled_topics:
                 continue
-            restored_topics.append(topic_id)
-            self.pending_topics.append(topic_id)
+            if self._enqueue_pending(topic_id):
+                restored_topics.append(topic_id)
 
         for topic_id, info in tasks_snapshot.items():
             topic_id = str(topic_id)
             if topic_id in self.handled_topics:
                 continue
-            if topic_id not in self.pending_topics:
+            if self._enqueue_pending(topic_id):
                 restored_topics.append(topic_id)
-                self.pending_topics.append(topic_id)
 
             task = TopicTask(topic_id=topic_id)
             task.status = "pending"
@@ -1048,7 +1620,7 @@ class AutoRunManager:
         payload = {
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "handled_topics_total": len(self.handled_topics),
-            "handled_topics": sorted(self.handled_topics),
+            "handled_topics": list(self.handled_topics),
             "pending_topics": list(self.pending_topics),
             "tasks": {},
         }
@@ -1061,24 +1633,90 @@ class AutoRunManager:
                 "log_path": str(task.log_path) if task.log_path else None,
                 "config_path": str(task.config_path) if task.config_path else None,
             }
-        _dump_json_file(self.status_path, payload)
-        print(f"[STATE] 已写入运行状态到 {self.status_path}")
+        _dump_json_file(self.status_path, payload, fsync=self.config.fsync)
+        logger.debug("[STATE] 已写入运行状态到 %s", self.status_path)
 
     # ========== 入口方法 ==========
     def command_loop(self) -> None:
+        # stdin 与自唤醒管道注册到同一 selector，request_stop 写管道即可立即唤醒
+        sel = selectors.DefaultSelector()
+        wake_r, wake_w = os.pipe()
+        os.set_blocking(wake_r, False)
+        self._wakeup_fd = wake_w
+        try:
+            try:
+                sel.register(sys.stdin, selectors.EVENT_READ)
+            except OSError:
+                # epoll 不接受普通文件与 /dev/null（nohup/systemd/重定向输入），
+                # 退回 select：此类 stdin 始终可读，读到 EOF 即按 exit 退出
+                sel.close()
+                sel = selectors.SelectSelector()
+                sel.register(sys.stdin, selectors.EVENT_READ)
+            sel.register(wake_r, selectors.EVENT_READ)
+            self._command_loop_body(sel, wake_r)
+        finally:
+            self._wakeup_fd = None
+            sel.close()
+            os.close(wake_r)
+            os.close(wake_w)
+
+    @staticmethod
+    def _pause_until_woken(wake_r: int, timeout: float) -> None:
+        # 只等唤醒管道而非 stop_event：主线程不持有 Event 锁，信号处理期间不会自锁
+        select.select([wake_r], [], [], max(0.0, timeout))
+
+    def supervise(self, worker: threading.Thread) -> None:
+        """无 REPL 模式：阻塞到停止请求或主循环线程退出。
+
+        信号经 set_wakeup_fd 写入同一个 socketpair，与 request_stop 共用一个等待原语；
+        select 超时只用于发现主循环意外退出。
+        """
+
+        sel = selectors.DefaultSelector()
+        wake_r, wake_w = socket.socketpair()
+        wake_r.setblocking(False)
+        wake_w.setblocking(False)
+        try:
+            prev_wakeup_fd: Optional[int] = signal.set_wakeup_fd(
+                wake_w.fileno(), warn_on_full_buffer=False
+            )
+        except ValueError:  # pragma: no cover - 非主线程无法设置
+            prev_wakeup_fd = None
+        self._wakeup_sock = wake_w
+        try:
+            sel.register(wake_r, selectors.EVENT_READ)
+            while worker.is_alive():
+                if self._consume_signal() or self.stop_event.is_set():
+                    break
+                if sel.select(timeout=self.config.command_poll_sec):
+                    try:
+                        wake_r.recv(4096)
+                    except OSError:  # pragma: no cover - 已被读空
+                        pass
+        finally:
+            self._wakeup_sock = None
+            if prev_wakeup_fd is not None:
+                signal.set_wakeup_fd(prev_wakeup_fd)
+            sel.close()
+            wake_r.close()
+            wake_w.close()
+
+    def _command_loop_body(self, sel: selectors.BaseSelector, wake_r: int) -> None:
         try:
             prompt_shown = False
             while not self.stop_event.is_set():
+                if self._consume_signal():
+                    break
                 try:
                     if not prompt_shown:
                         # 主动刷新提示符，避免被后台日志刷屏覆盖
                         print("poly> ", end="", flush=True)
                         prompt_shown = True
 
-                    ready, _, _ = select.select(
-                        [sys.stdin], [], [], self.config.command_poll_sec
-                    )
-                    if not ready:
+                    events = sel.select(timeout=self.config.command_poll_sec)
+                    if self._consume_signal() or self.stop_event.is_set():
+                        break
+                    if not any(key.fileobj is sys.stdin for key, _ in events):
                         continue
 
                     line = sys.stdin.readline()
@@ -1092,7 +1730,7 @@ class AutoRunManager:
                 except Exception as exc:  # pragma: no cover - 保护交互循环不被意外异常终止
                     print(f"[ERROR] command loop input failed: {exc}")
                     traceback.print_exc()
-                    time.sleep(self.config.command_poll_sec)
+                    self._pause_until_woken(wake_r, self.config.command_poll_sec)
                     continue
                 # 立刻反馈收到的命令，避免在日志刷屏时用户误以为命令未被捕获
                 if cmd:
@@ -1101,16 +1739,23 @@ class AutoRunManager:
                     # 空行依旧入队，后续会在 _handle_command 里被忽略
                     print("[CMD] received: <empty>")
                 self.enqueue_command(cmd)
-                # 轻微休眠，防止输入为空或重复换行时产生过多提示刷屏
-                time.sleep(self.config.command_poll_sec)
-        except KeyboardInterrupt:
-            print("\n[WARN] Ctrl+C detected, stopping...")
-            self.stop_event.set()
+                # 轻微休眠，防止输入为空或重复换行时产生过多提示刷屏；
+                # 收到 exit/信号时唤醒管道立即返回
+                self._pause_until_woken(wake_r, self.config.command_poll_sec)
         except Exception as exc:  # pragma: no cover - 防御性保护
             print(f"[ERROR] command loop crashed: {exc}")
             traceback.print_exc()
 
 
+# 无参数命令分发表；带参数的 stop <topic> 仍走前缀匹配
+_CMD_TABLE: Dict[str, Callable[[AutoRunManager], None]] = {
+    "quit": AutoRunManager._cmd_exit,
+    "exit": AutoRunManager._cmd_exit,
+    "list": AutoRunManager._print_status,
+    "refresh": AutoRunManager._cmd_refresh,
+}
+
+
 # =====================
 # CLI 入口
 # =====================
@@ -1151,22 +1796,23 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="append",
         help="启动后自动执行的命令（可多次提供），例如 list 或 stop <topic_id>",
     )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="输出调试级别日志（状态落盘、错峰延迟等高频信息）",
+    )
     return parser.parse_args(argv)
 
 
 def load_configs(
     args: argparse.Namespace,
 ) -> tuple[GlobalConfig, Dict[str, Any], FilterConfig, Dict[str, Any]]:
-    global_conf_raw = _load_json_file(args.global_config)
+    # 筛选参数最常被手工修改、也最易出错，先解析校验，出错时不再读取其余文件
+    filter_conf = FilterConfig.from_dict(_load_json_file(args.filter_config))
+    global_conf = GlobalConfig.from_dict(_load_json_file(args.global_config))
     strategy_conf_raw = _load_json_file(args.strategy_config)
-    filter_conf_raw = _load_json_file(args.filter_config)
     run_params_template = _load_json_file(args.run_config_template)
-    return (
-        GlobalConfig.from_dict(global_conf_raw),
-        strategy_conf_raw,
-        FilterConfig.from_dict(filter_conf_raw),
-        run_params_template,
-    )
+    return global_conf, strategy_conf_raw, filter_conf, run_params_template
 
 
 def run_filter_once(
@@ -1176,19 +1822,25 @@ def run_filter_once(
     timeout_sec: Optional[float] = None,
     max_retries: int = 0,
     retry_delay_sec: float = 3.0,
+    write_output: Callable[[Path, Dict[str, Any]], None] = _dump_filter_result,
 ) -> List[Dict[str, Any]]:
-    """调用筛选脚本，落盘 JSON，并返回话题列表，带超时与可选重试。"""
+    """调用筛选脚本，落盘 JSON，并返回话题列表，带超时与可选重试。
+
+    write_output 可替换为异步写盘（AutoRunManager 传入写盘线程），默认同步写入。
+    """
 
+    filter_script = _load_filter_script()
     filter_conf.apply_blacklist()
     filter_conf.apply_highlight()
 
+    filter_kwargs = filter_conf.to_filter_kwargs()
     attempts = max(1, int(max_retries) + 1)
     for attempt in range(1, attempts + 1):
         timeout_label = f"{timeout_sec}s" if timeout_sec is not None else "no-timeout"
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
                 future = executor.submit(
-                    filter_script.collect_filter_results, **filter_conf.to_filter_kwargs()
+                    filter_script.collect_filter_results, **filter_kwargs
                 )
                 result = (
                     future.result(timeout=timeout_sec)
@@ -1221,29 +1873,29 @@ def run_filter_once(
             continue
         highlight_map.setdefault(slug, []).append(side)
 
-    topics: List[Dict[str, Any]] = []
-    for ms in result.chosen:
-        highlight_sides = highlight_map.get(ms.slug, [])
-        if not highlight_sides:
-            # 仅保留命中高亮条件的市场，避免不满足高亮口径的条目进入 topics 列表
-            continue
-        preferred_side = highlight_sides[0]
-        topics.append(
-            {
-                "slug": ms.slug,
-                "title": ms.title,
-                "yes_token": ms.yes.token_id,
-                "no_token": ms.no.token_id,
-                "end_time": ms.end_time.isoformat() if ms.end_time else None,
-                "liquidity": ms.liquidity,
-                "total_volume": ms.totalVolume,
-                "preferred_side": preferred_side,
-                "highlight_sides": highlight_sides,
-            }
-        )
+    # 仅保留命中高亮条件的市场，避免不满足高亮口径的条目进入 topics 列表
+    topics: List[Dict[str, Any]] = [
+        {
+            "slug": ms.slug,
+            "title": ms.title,
+            "yes_token": ms.yes.token_id,
+            "no_token": ms.no.token_id,
+            "end_time": ms.end_time.isoformat() if ms.end_time else None,
+            "liquidity": ms.liquidity,
+            "total_volume": ms.totalVolume,
+            "preferred_side": highlight_sides[0],
+            "highlight_sides": highlight_sides,
+        }
+        for ms in result.chosen
+        if (highlight_sides := highlight_map.get(ms.slug))
+    ]
 
+    t = time.gmtime()
     payload = {
-        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "generated_at": (
+            f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+            f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+        ),
         "params": filter_conf.to_dict(),
         "total_markets": result.total_markets,
         "candidates": len(result.candidates),
@@ -1252,22 +1904,30 @@ def run_filter_once(
         "highlights": len(result.highlights),
         "topics": topics,
     }
-    _dump_json_file(output_path, payload)
-    print(f"[FILTER] 已写入筛选结果到 {output_path}，共 {len(topics)} 个话题")
+    write_output(output_path, payload)
+    print(f"[FILTER] 筛选完成，结果写入 {output_path}，共 {len(topics)} 个话题")
     return topics
 
 
 def main(argv: Optional[List[str]] = None) -> None:
     args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
     global_conf, strategy_conf, filter_conf, run_params_template = load_configs(args)
+    # 配置校验通过后再导入筛选脚本；缺少依赖时在启动阶段即报错退出
+    _load_filter_script()
 
     manager = AutoRunManager(global_conf, strategy_conf, filter_conf, run_params_template)
 
     def _handle_sigterm(signum: int, frame: Any) -> None:  # pragma: no cover - 信号处理不可测
-        print(f"\n[WARN] signal {signum} received, exiting...")
-        manager.stop_event.set()
+        manager.handle_signal(signum)
 
     signal.signal(signal.SIGTERM, _handle_sigterm)
+    signal.signal(signal.SIGINT, _handle_sigterm)
+    manager.install_child_watcher()
 
     worker = threading.Thread(target=manager.run_loop, daemon=True)
     worker.start()
@@ -1277,12 +1937,7 @@ def main(argv: Optional[List[str]] = None) -> None:
             manager.enqueue_command(cmd)
 
     if args.no_repl or args.command:
-        try:
-            while worker.is_alive():
-                time.sleep(global_conf.command_poll_sec)
-        except KeyboardInterrupt:
-            print("\n[WARN] Ctrl+C detected, stopping...")
-            manager.stop_event.set()
+        manager.supervise(worker)
     else:
         manager.command_loop()
 